@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-import hmac, hashlib, os, subprocess
+import hmac, os, signal
 from flask import Flask, request, abort
 
 
@@ -13,8 +13,13 @@ def verify(sig_header: str, body: bytes) -> bool:
         return False
     if not sig_header or not sig_header.startswith("sha256="):
         return False
-    digest = "sha256=" + hmac.new(SECRET, body, hashlib.sha256).hexdigest()
-    return hmac.compare_digest(digest, sig_header)
+    try:
+        provided = bytes.fromhex(sig_header[7:])
+    except ValueError:
+        return False
+    # hmac.digest() takes the C one-shot path; compare raw bytes, no hex round-trip
+    expected = hmac.digest(SECRET, body, "sha256")
+    return hmac.compare_digest(expected, provided)
 
 @app.post("/webhook")
 def webhook():
@@ -22,8 +27,18 @@ def webhook():
     if not verify(sig, request.data):
         abort(403)
     
-    subprocess.Popen([DEPLOY])
-    return "ok\n", 200
+    # posix_spawn skips the Python-side fork/exec bookkeeping of subprocess;
+    # the deploy runs detached, so answer 202 without waiting for it.
+    os.posix_spawn(DEPLOY, [DEPLOY], os.environ)
+    return "ok\n", 202
 
 if __name__ == "__main__":
-    app.run("127.0.0.1", 3011)
+    # spawned deploys run detached and are never waited on; let the kernel
+    # reap them instead of accumulating one zombie per delivery
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    try:
+        from waitress import serve
+        serve(app, host="127.0.0.1", port=3011, threads=4)
+    except ImportError:
+        # fallback: Werkzeug dev server
+        app.run("127.0.0.1", 3011)
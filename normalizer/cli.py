@@ -15,12 +15,19 @@ def main():
                         help="Output metadata.json path (defaults to <vault_root>/metadata.json)")
     p_norm.add_argument("--shortest", choices=["vault", "relative"], default="vault",
                         help="Shortest path mode for note links in text (default: vault)")
+    p_norm.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Worker processes for per-file processing (default: CPU count)")
+    p_norm.add_argument("--compact", action="store_true",
+                        help="Write metadata.json without indentation (smaller/faster)")
+    p_norm.add_argument("--force", action="store_true",
+                        help="Reprocess every file, ignoring the incremental cache")
     args = parser.parse_args()
 
     if args.cmd == "normalize":
         root = args.vault_root.resolve()
         out = args.output.resolve() if args.output else (root / "metadata.json")
-        items = build_metadata(root=root, output=out, shortest_mode=args.shortest)
+        items = build_metadata(root=root, output=out, shortest_mode=args.shortest,
+                               jobs=args.jobs, compact=args.compact, force=args.force)
         print(f"Wrote {out} with {len(items)} items")
     else:
         parser.print_help()
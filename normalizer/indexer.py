@@ -4,25 +4,113 @@ High-level orchestration:
 - Build backlinks
 - Write metadata.json
 """
+import hashlib
 import json
+import os
+import sys
+import zlib
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict
-from .links import Resolver, is_md, WIKI_LINK, MD_LINK
+
+try:
+    import orjson  # optional: much faster serializer, emits bytes directly
+except ImportError:
+    orjson = None
+try:
+    import xxhash  # optional: much faster content digest than the stdlib hashes
+except ImportError:
+    xxhash = None
+from .links import (Resolver, scan_vault, path_name, path_stem,
+                    COMBINED_LINK, WIKI_BANG_I, WIKI_BODY_I, MD_TEXT_I, MD_URL_I)
 from .parse import extract_headings, parse_frontmatter_and_tags
 from .utils import CodeMasker
 
 def extract_headings_safe(text: str) -> list[dict]:
     m = CodeMasker.mask(text)
-    return extract_headings(m.text.splitlines())
+    return extract_headings(m.text)
+
+def _read_bytes(p: Path) -> bytes:
+    """One open/fstat/read round-trip per file, skipping the io.open text stack."""
+    fd = os.open(p, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        data = os.read(fd, size)
+        while len(data) < size:  # regular files rarely short-read, but be safe
+            chunk = os.read(fd, size - len(data))
+            if not chunk:
+                break
+            data += chunk
+    finally:
+        os.close(fd)
+    return data
+
+def _read_text(p: Path) -> str:
+    return _read_bytes(p).decode("utf-8", "ignore")
+
+# Content digest for the incremental cache: a fast non-cryptographic hash is
+# plenty for change detection. The algorithm is recorded in the cache so a
+# file written with one is never checked with the other.
+_HASH_ALGO = "xxh3-64" if xxhash else "crc32"
+
+def _content_hash(data: bytes) -> str:
+    if xxhash is not None:
+        return xxhash.xxh3_64(data).hexdigest()
+    return format(zlib.crc32(data), "08x")
+
+def _write_text(p: Path, text: str):
+    data = text.encode("utf-8")
+    fd = os.open(p, os.O_WRONLY | os.O_TRUNC | os.O_CREAT, 0o644)
+    try:
+        while data:  # loop on short writes, mirroring the read side
+            n = os.write(fd, data)
+            data = data[n:]
+    finally:
+        os.close(fd)
+
+# Write-back is deferred to a tiny per-process thread pool: os.write releases
+# the GIL, so rewriting file N overlaps the regex work on file N+1 instead of
+# stalling it. Each process (parent or pool worker) gets its own queue.
+_WRITER: ThreadPoolExecutor | None = None
+_PENDING_WRITES: List[Future] = []
+
+def _queue_write(p: Path, text: str):
+    global _WRITER
+    if _WRITER is None:
+        _WRITER = ThreadPoolExecutor(max_workers=2, thread_name_prefix="writeback")
+    # surface failures from already-finished writes before queueing more
+    if _PENDING_WRITES and _PENDING_WRITES[0].done():
+        flush_writes(only_done=True)
+    _PENDING_WRITES.append(_WRITER.submit(_write_text, p, text))
+
+def flush_writes(only_done: bool = False):
+    """Wait for queued writes and re-raise the first failure, if any."""
+    if only_done:
+        done = [f for f in _PENDING_WRITES if f.done()]
+        _PENDING_WRITES[:] = [f for f in _PENDING_WRITES if not f.done()]
+    else:
+        done = _PENDING_WRITES[:]
+        _PENDING_WRITES.clear()
+    for f in done:
+        f.result()
 
-def process_file(p: Path, R: Resolver) -> Dict:
-    rel = R.rel_from_root(p)
-    original = p.read_text(encoding="utf-8", errors="ignore")
+def process_file(p: Path, R: Resolver, text: str | None = None) -> Dict:
+    # the same relativePath string ends up in links, forward map and every
+    # backlink entry — intern it so all of them share one object
+    rel = sys.intern(R.rel_from_root(p))
+    original = _read_text(p) if text is None else text
 
     fm, tags, aliases, body0 = parse_frontmatter_and_tags(original)
 
-    stage1 = R.normalize_md_links_to_wikilinks(p, body0)
-    norm   = R.normalize_wikilinks_in_text(p, stage1)
+    # Most notes carry few or no links; a substring probe is far cheaper than
+    # running the regex passes and their Python-level callbacks.
+    has_wiki = "[[" in body0
+    has_md   = "](" in body0
+    if has_wiki or has_md:
+        norm = R.normalize_all(p, body0)
+    else:
+        norm = body0
 
     if norm != body0:
         if body0 is not original:
@@ -30,69 +118,77 @@ def process_file(p: Path, R: Resolver) -> Dict:
             new_text = original[:head_len] + norm
         else:
             new_text = norm
-        p.write_text(new_text, encoding="utf-8")
+        _queue_write(p, new_text)
 
-    headings = extract_headings_safe(norm)
+    # Heading extraction needs a line list; skip it when no heading marker
+    # (ATX "#" at line start, or a setext ===/--- underline) can be present.
+    if norm.startswith("#") or "\n#" in norm or "===" in norm or "---" in norm:
+        headings = extract_headings_safe(norm)
+    else:
+        headings = []
 
     links = []
-    masked = CodeMasker.mask(norm)
-    # wikilinks (notes + anchors) — skip attachments (!)
-    for m in WIKI_LINK.finditer(masked.text):
-        bang = m.group("bang")
-        if bang == "!":
-            continue
-        body = m.group("body")
-        display = None
-        target_part = body
-        if "|" in body:
-            target_part, display = body.split("|", 1)
-
-        text_path, meta_rel_with_md = R.resolve_target_for_text_and_meta(p, body)
-        if not meta_rel_with_md:
-            continue
-        # only keep links that actually point to .md files
-        if not (R.ROOT / meta_rel_with_md).exists():
-            continue
-
-        if "#" in target_part:
-            anchor = "#" + target_part.split("#", 1)[1]
-            entry = {
-                "link": anchor,
-                "relativePath": meta_rel_with_md,
-                "cleanLink": Path(meta_rel_with_md).stem
-            }
-            if display:
-                entry["displayText"] = display
-        else:
-            basename = Path(target_part).name
-            entry = {
-                "link": basename,
-                "relativePath": meta_rel_with_md
-            }
-            if display:
-                entry["displayText"] = display
-        links.append(entry)
-
-    # pure anchor markdown links [text](#PDF)
-    for m in MD_LINK.finditer(masked.text):
-        url = m.group("url").strip()
-        if url.startswith("#"):
-            anchor = url
-            display = m.group("text").strip() or anchor.lstrip("#")
-            links.append({
-                "link": anchor,
-                "relativePath": rel,
-                "cleanLink": Path(rel).stem,
-                "displayText": display
-            })
+    anchor_links = []
+    if has_wiki or has_md:
+        masked = CodeMasker.mask(norm)
+        # one pass over the body: wikilinks (notes + anchors, attachments skipped)
+        # and pure anchor markdown links [text](#PDF)
+        for m in COMBINED_LINK.finditer(masked.text):
+            body = m.group(WIKI_BODY_I)
+            if body is None:
+                url = m.group(MD_URL_I).strip()
+                if url.startswith("#"):
+                    anchor = url
+                    display = m.group(MD_TEXT_I).strip() or anchor.lstrip("#")
+                    anchor_links.append({
+                        "link": anchor,
+                        "relativePath": rel,
+                        "cleanLink": path_stem(rel),
+                        "displayText": display
+                    })
+                continue
+            if m.group(WIKI_BANG_I) == "!":
+                continue
+            display = None
+            target_part = body
+            if "|" in body:
+                target_part, display = body.split("|", 1)
+
+            text_path, meta_rel_with_md = R.resolve_target_for_text_and_meta(p, body)
+            if not meta_rel_with_md:
+                continue
+            meta_rel_with_md = sys.intern(meta_rel_with_md)
+            # only keep links that actually point to .md files
+            if not (R.ROOT / meta_rel_with_md).exists():
+                continue
+
+            if "#" in target_part:
+                anchor = "#" + target_part.split("#", 1)[1]
+                entry = {
+                    "link": anchor,
+                    "relativePath": meta_rel_with_md,
+                    "cleanLink": path_stem(meta_rel_with_md)
+                }
+                if display:
+                    entry["displayText"] = display
+            else:
+                basename = path_name(target_part)
+                entry = {
+                    "link": basename,
+                    "relativePath": meta_rel_with_md
+                }
+                if display:
+                    entry["displayText"] = display
+            links.append(entry)
+
+        links += anchor_links
 
     if links:
-        uniq, seen = [], set()
-        for L in links:
-            key = (L.get("link"), L.get("relativePath"), L.get("displayText"))
-            if key not in seen:
-                uniq.append(L); seen.add(key)
-        links = uniq
+        # dedupe inside the C dict constructor; insertion order is kept
+        links = list({
+            (L.get("link"), L.get("relativePath"), L.get("displayText")): L
+            for L in links
+        }.values())
 
     item: Dict = {"fileName": p.stem, "relativePath": rel}
     if tags:      item["tags"] = tags
@@ -102,26 +198,144 @@ def process_file(p: Path, R: Resolver) -> Dict:
     if links:     item["links"] = links
     return item
 
-def build_metadata(root: Path, output: Path, shortest_mode: str = "vault") -> List[Dict]:
+# Per-worker Resolver, set up once by the pool initializer so every task
+# reuses the prebuilt indexes instead of re-scanning the vault.
+_WORKER_R: Resolver | None = None
+
+def _init_worker(root: Path, shortest_mode: str, md_files: List[Path], asset_files: List[Path]):
+    global _WORKER_R
+    _WORKER_R = Resolver(root=root, shortest_mode=shortest_mode,
+                         md_files=md_files, asset_files=asset_files)
+
+def _process_one(p: Path) -> Dict:
+    item = process_file(p, _WORKER_R)
+    # settle this file's write before the task reports success: a failed
+    # write-back then surfaces as a task exception in the parent instead of
+    # dying unseen with the worker. The write still overlaps the heading and
+    # link extraction queued after it inside process_file.
+    flush_writes()
+    return item
+
+# Incremental cache: items of unchanged files are reused across runs.
+CACHE_NAME = ".perlite_cache.json"
+_CACHE_VERSION = 2
+
+def _fileset_sig(rels: List[str]) -> str:
+    # link resolution depends on the whole vault layout, so any added/removed
+    # note invalidates the cache outright
+    return hashlib.sha1("\n".join(rels).encode("utf-8")).hexdigest()
+
+def _load_cache(path: Path, mode: str, fileset: str) -> Dict[str, Dict]:
+    try:
+        raw = path.read_bytes()
+        data = orjson.loads(raw) if orjson else json.loads(raw)
+    except (OSError, ValueError):
+        return {}
+    if (data.get("version") != _CACHE_VERSION
+            or data.get("mode") != mode
+            or data.get("algo") != _HASH_ALGO
+            or data.get("fileset") != fileset):
+        return {}
+    return data.get("files", {})
+
+def _save_cache(path: Path, mode: str, fileset: str, files: Dict[str, Dict]):
+    data = {"version": _CACHE_VERSION, "mode": mode, "algo": _HASH_ALGO,
+            "fileset": fileset, "files": files}
+    blob = orjson.dumps(data) if orjson else json.dumps(data, ensure_ascii=False).encode("utf-8")
+    try:
+        path.write_bytes(blob)
+    except OSError:
+        pass  # cache is best-effort; never fail the build over it
+
+def build_metadata(root: Path, output: Path, shortest_mode: str = "vault",
+                   jobs: int | None = None, compact: bool = False,
+                   force: bool = False) -> List[Dict]:
     root = root.resolve()
-    R = Resolver(root=root, shortest_mode=shortest_mode)
-    all_md = [p for p in root.rglob("*") if p.is_file() and is_md(p)]
+    all_md, assets, md_stats = scan_vault(root)
+    all_md.sort()
+    R = Resolver(root=root, shortest_mode=shortest_mode, md_files=all_md, asset_files=assets)
+
+    rels = [R.rel_from_root(p) for p in all_md]
+    # normalized bodies embed attachments resolved by basename, so the asset
+    # layout is part of the cache key just like the note set
+    asset_rels = sorted(R.rel_from_root(p) for p in assets)
+    fileset = _fileset_sig(rels + asset_rels)
+    cache_files = {} if force else _load_cache(root / CACHE_NAME, shortest_mode, fileset)
+
+    items_by_rel: Dict[str, Dict] = {}
+    to_process: List[Path] = []
+    for p, rel in zip(all_md, rels):
+        c = cache_files.get(rel)
+        if c is None:
+            to_process.append(p)
+        elif (c.get("mtime"), c.get("size")) == md_stats[p]:
+            items_by_rel[rel] = c["item"]
+        elif c.get("hash") == _content_hash(_read_bytes(p)):
+            # stat changed but content didn't (touch, checkout, rsync):
+            # reuse the item and just refresh the recorded stat
+            items_by_rel[rel] = c["item"]
+            c["mtime"], c["size"] = md_stats[p]
+        else:
+            to_process.append(p)
 
-    items = [process_file(p, R) for p in all_md]
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs > 1 and len(to_process) > 1:
+        # Each file is independent (read, normalize, write back), so the
+        # regex-heavy work scales across cores. Chunks amortize IPC but must
+        # stay small enough to keep every worker busy on medium vaults.
+        chunksize = max(1, min(32, len(to_process) // (jobs * 4)))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(root, shortest_mode, all_md, assets)) as ex:
+            new_items = list(ex.map(_process_one, to_process, chunksize=chunksize))
+    else:
+        # Sequential path: read a short window ahead on reader threads so the
+        # next files' I/O overlaps the current file's regex work. The window
+        # bounds memory to a handful of bodies; the pooled path gets the same
+        # overlap from the workers themselves.
+        readahead = 8
+        new_items = []
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="readahead") as readers:
+            queue = deque(readers.submit(_read_text, p) for p in to_process[:readahead])
+            for i, p in enumerate(to_process):
+                text = queue.popleft().result()
+                if i + readahead < len(to_process):
+                    queue.append(readers.submit(_read_text, to_process[i + readahead]))
+                new_items.append(process_file(p, R, text=text))
+    # settle deferred write-backs before the cache re-stats the files below
+    # (pool workers drain their own queues when the executor shuts down)
+    flush_writes()
+
+    for p, item in zip(to_process, new_items):
+        rel = item["relativePath"]
+        items_by_rel[rel] = item
+        # stat and hash again: normalization may just have rewritten the file
+        st = os.stat(p)
+        cache_files[rel] = {"mtime": st.st_mtime_ns, "size": st.st_size,
+                            "hash": _content_hash(_read_bytes(p)), "item": item}
+
+    # persist the cache before backlinks are attached; backlinks are always
+    # recomputed from the full item list below
+    _save_cache(root / CACHE_NAME, shortest_mode, fileset, cache_files)
+
+    items = [items_by_rel[rel] for rel in rels]
 
     # backlinks
-    forward: Dict[str, List[str]] = {}
+    forward: Dict[str, List[str]] = defaultdict(list)
+    # stems of every item, computed once with string ops (no Path per edge)
+    stems = {it["relativePath"]: path_stem(it["relativePath"]) for it in items}
     for it in items:
+        rel = it["relativePath"]
         for ln in it.get("links", []):
-            forward.setdefault(ln["relativePath"], []).append(it["relativePath"])
+            forward[ln["relativePath"]].append(rel)
 
     for it in items:
-        srcs = forward.get(it["relativePath"], [])
+        srcs = forward.get(it["relativePath"])
         if srcs:
-            this_name = Path(it["relativePath"]).stem
+            this_name = stems[it["relativePath"]]
             it["backlinks"] = [
                 {
-                    "fileName": Path(src).stem,
+                    "fileName": stems[src],
                     "link": this_name,
                     "relativePath": src,
                     "displayText": this_name
@@ -129,5 +343,42 @@ def build_metadata(root: Path, output: Path, shortest_mode: str = "vault") -> Li
                 for src in srcs
             ]
 
-    output.write_text(json.dumps(items, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    _dump_items(output, items, compact=compact)
     return items
+
+def _dump_items(output: Path, items: List[Dict], compact: bool = False):
+    """Stream items to the output file one at a time.
+
+    Serializing per item keeps peak memory at the largest single item instead
+    of the whole rendered document, and lets orjson do the encoding when it is
+    installed.
+    """
+    # pick the per-item encoder once, not per item
+    if compact:
+        if orjson:
+            dumps = orjson.dumps
+        else:
+            def dumps(it):
+                return json.dumps(it, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    else:
+        if orjson:
+            def dumps(it):
+                return orjson.dumps(it, option=orjson.OPT_INDENT_2)
+        else:
+            def dumps(it):
+                return json.dumps(it, ensure_ascii=False, indent=2).encode("utf-8")
+
+    with output.open("wb") as f:
+        f.write(b"[")
+        for i, it in enumerate(items):
+            if compact:
+                if i:
+                    f.write(b",")
+                f.write(dumps(it))
+            else:
+                # keep the layout of json.dumps(items, indent=2)
+                f.write(b",\n  " if i else b"\n  ")
+                f.write(dumps(it).replace(b"\n", b"\n  "))
+        if items and not compact:
+            f.write(b"\n")
+        f.write(b"]\n")
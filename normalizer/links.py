@@ -4,57 +4,253 @@ Link resolution & normalization:
 - Attachment links become relative-to-current-file (always)
 - Build/maintain basename index per vault
 """
+import functools
 import os
+import posixpath
 import re
 from pathlib import Path
 from typing import Dict, List, Tuple
+from .patterns import compile_linear
 from .utils import CodeMasker, Masked
 
-MD_LINK   = re.compile(r'(!?)\[(?P<text>[^\]]*)\]\((?P<url>[^)]+)\)')
-WIKI_LINK = re.compile(r'(?P<bang>!?)\[\[(?P<body>.+?)\]\]')
+# Both link forms in one alternation so extraction walks the text once.
+# Group names are prefixed to keep the two patterns from colliding.
+# Stays on the stdlib engine: the hot loops index groups through
+# groupindex, which the re2 wrapper does not guarantee.
+COMBINED_LINK = re.compile(
+    r'(?P<wiki_bang>!?)\[\[(?P<wiki_body>.+?)\]\]'
+    r'|(?P<md_bang>!?)\[(?P<md_text>[^\]]*)\]\((?P<md_url>[^)]+)\)'
+)
+
+# Integer group indices for COMBINED_LINK: m.group(int) skips the per-match
+# name lookup in the hottest loops.
+WIKI_BANG_I = COMBINED_LINK.groupindex["wiki_bang"]
+WIKI_BODY_I = COMBINED_LINK.groupindex["wiki_body"]
+MD_BANG_I   = COMBINED_LINK.groupindex["md_bang"]
+MD_TEXT_I   = COMBINED_LINK.groupindex["md_text"]
+MD_URL_I    = COMBINED_LINK.groupindex["md_url"]
+
+# External URLs (scheme: or protocol-relative //) that must be left alone
+_URL_SCHEME_RE = compile_linear(r'^(?:[a-zA-Z][a-zA-Z0-9+.-]*:|//)')
 
 MD_EXTS  = {".md", ".markdown", ".mdown"}
 IMG_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg", ".pdf"}
 ASSET_EXTS = IMG_EXTS | {".mp4", ".m4a", ".webm", ".mov", ".mp3", ".wav", ".ogg"}
 
+_MD_SUFFIXES = tuple(MD_EXTS)
+
 def is_md(p: Path) -> bool:
     return p.suffix.lower() in MD_EXTS
 
+def scan_vault(root: Path) -> Tuple[List[Path], List[Path], Dict[Path, Tuple[int, int]]]:
+    """Collect (markdown files, all other files, md (mtime_ns, size) stats) in
+    one os.scandir walk. Non-markdown files of any type are kept: attachment
+    links may embed csv/zip/whatever, not just media.
+
+    DirEntry caches the file-type info from the directory read itself, so this
+    avoids the stat() per entry that Path.rglob("*") + is_file() would issue.
+    The md stats come from the same cached DirEntry and feed the incremental
+    cache. Symlinks are skipped to avoid cycles.
+    """
+    md_files: List[Path] = []
+    asset_files: List[Path] = []
+    md_stats: Dict[Path, Tuple[int, int]] = {}
+    stack = [str(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue  # unreadable directory: skip it, like rglob did
+        with it:
+            for entry in it:
+                # cheap name filter first; the type checks (which exclude
+                # symlinks) only run for entries that can matter
+                if entry.name.lower().endswith(_MD_SUFFIXES):
+                    if entry.is_file(follow_symlinks=False):
+                        p = Path(entry.path)
+                        md_files.append(p)
+                        st = entry.stat(follow_symlinks=False)
+                        md_stats[p] = (st.st_mtime_ns, st.st_size)
+                        continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    asset_files.append(Path(entry.path))
+    return md_files, asset_files, md_stats
+
+# String equivalents of Path.name/.stem/.suffix for the POSIX-relative paths
+# used throughout resolution. Building a Path object per link just to split a
+# string is measurable on large vaults.
+
+def path_name(path_str: str) -> str:
+    """Final component, like Path(path_str).name."""
+    return path_str.rstrip("/").rpartition("/")[2]
+
+def path_stem(path_str: str) -> str:
+    """Final component without its extension, like Path(path_str).stem."""
+    name = path_name(path_str)
+    dot = name.rfind(".")
+    return name[:dot] if dot > 0 else name
+
+def suffix_lower(path_str: str) -> str:
+    """Lower-cased extension with the dot, like Path(path_str).suffix.lower()."""
+    name = path_str.rpartition("/")[2]
+    dot = name.rfind(".")
+    return name[dot:].lower() if dot > 0 else ""
+
 def strip_md_ext(path_str: str) -> str:
-    p = Path(path_str)
-    if p.suffix.lower() in MD_EXTS:
-        return p.with_suffix("").as_posix()
-    return p.as_posix()
+    sfx = suffix_lower(path_str)
+    if sfx in MD_EXTS:
+        return path_str[:-len(sfx)]
+    return path_str
 
 def to_rel(base: Path, abs_file: Path) -> str:
     return os.path.relpath(abs_file, start=base).replace("\\", "/")
 
+@functools.lru_cache(maxsize=None)
+def _resolve_cached(path_str: str) -> str:
+    """Path.resolve() walks the filesystem for symlinks; the answer per path
+    never changes during a run, so cache it keyed by the string path."""
+    return str(Path(path_str).resolve())
+
+def _resolved(p: Path) -> str:
+    return _resolve_cached(str(p))
+
 class Resolver:
-    def __init__(self, root: Path, shortest_mode: str = "vault"):
+    def __init__(self, root: Path, shortest_mode: str = "vault",
+                 md_files: List[Path] | None = None,
+                 asset_files: List[Path] | None = None):
         self.ROOT = root.resolve()
         self.mode = shortest_mode  # "vault" or "relative"
-        # Index all markdown files for basename/stem lookup
-        self.ALL_MD: List[Path] = sorted([p for p in self.ROOT.rglob("*") if p.is_file() and is_md(p)])
+        # Callers that already walked the vault (build_metadata) pass the lists
+        # in so the tree is only scanned once.
+        if md_files is None or asset_files is None:
+            md_files, asset_files, _ = scan_vault(self.ROOT)
+        # Index all markdown files for basename/stem lookup.
+        self.ALL_MD: List[Path] = sorted(md_files)
         self.BASENAME_INDEX: Dict[str, List[Path]] = {}
+        # Vault-relative POSIX string per markdown Path, computed once; every
+        # later rel_from_root on an indexed file is a dict hit.
+        self._rel_str: Dict[Path, str] = {}
         for p in self.ALL_MD:
             self.BASENAME_INDEX.setdefault(p.name, []).append(p)
             self.BASENAME_INDEX.setdefault(p.stem, []).append(p)
+            self._rel_str[p] = p.relative_to(self.ROOT).as_posix()
+        # Vault-relative POSIX paths of every markdown file, so link targets can
+        # be checked with a set lookup instead of a stat() per link.
+        self.REL_SET: set[str] = set(self._rel_str.values())
+        # Reverse-segment suffix trie over all note paths, built lazily on the
+        # first shortest-suffix query (None until then).
+        self._suffix_trie: dict | None = None
+        # Index attachments by exact basename and by stem so asset links are a
+        # dict lookup instead of a vault-wide rglob per link. Each entry keeps
+        # its vault-relative parts precomputed so ranking runs on plain strings.
+        # The exact-name index covers every non-markdown file (embeds are not
+        # limited to media); the stem index only tries the known asset
+        # extensions, matching the old extensionless fallback.
+        self.ASSET_BY_NAME: Dict[str, List[Tuple[Tuple[str, ...], Path]]] = {}
+        self.ASSET_BY_STEM: Dict[str, List[Tuple[Tuple[str, ...], Path]]] = {}
+        for p in sorted(asset_files):
+            info = (p.relative_to(self.ROOT).parts, p)
+            self.ASSET_BY_NAME.setdefault(p.name, []).append(info)
+            if p.suffix.lower() in ASSET_EXTS:
+                self.ASSET_BY_STEM.setdefault(p.stem, []).append(info)
+        # notes are embeddable by explicit basename as well (the old rglob
+        # matched any file type), so they join the exact-name index; the stem
+        # index stays media-only
+        for p in self.ALL_MD:
+            info = (tuple(self._rel_str[p].split("/")), p)
+            self.ASSET_BY_NAME.setdefault(p.name, []).append(info)
+        # Caches for shortest-suffix computation. The indexes above never
+        # change after __init__, so results can be memoized per target.
+        self._rel_noext: Dict[Path, str] = {
+            p: strip_md_ext(rel) for p, rel in self._rel_str.items()
+        }
+        self._conflict_noext: Dict[str, set] = {}
+        self._noext_set: set[str] = set(self._rel_noext.values())
+        self._shortest_cache: Dict[str, str] = {}
+        self._parts_cache: Dict[Path, Tuple[str, ...] | None] = {}
+        # Per-link resolution memo. Results depend only on the note's
+        # directory and the raw link text, and every link is resolved twice
+        # per file (once for the rewritten body, once for metadata), so
+        # repeated links become a dict hit.
+        self._target_memo: Dict[Tuple[Path, str], str] = {}
+        self._resolve_memo: Dict[Tuple[Path, str], Tuple[str, str | None]] = {}
+        # The mode never changes after construction, so bind the shortest-path
+        # strategy once instead of re-branching on every link.
+        self._shortest_for = (self._shortest_relative_from_current
+                              if self.mode == "relative"
+                              else self._shortest_vault_from_current)
 
     # ----- utilities bound to this vault -----
 
     def rel_from_root(self, path: Path) -> str:
-        return path.relative_to(self.ROOT).as_posix()
+        rel = self._rel_str.get(path)
+        if rel is None:
+            rel = path.relative_to(self.ROOT).as_posix()
+            self._rel_str[path] = rel
+        return rel
+
+    def _base_parts(self, base: Path) -> Tuple[str, ...] | None:
+        """Vault-relative parts of a base directory, cached (None if outside)."""
+        bparts = self._parts_cache.get(base)
+        if bparts is None and base not in self._parts_cache:
+            try:
+                bparts = base.relative_to(self.ROOT).parts
+            except ValueError:
+                bparts = None
+            self._parts_cache[base] = bparts
+        return bparts
+
+    def _to_rel(self, base: Path, target: Path) -> str:
+        """to_rel for paths under the vault root, without os.path.relpath.
+
+        Both arguments share self.ROOT, so the relative path reduces to
+        comparing the cached vault-relative parts — no getcwd()/abspath work.
+        """
+        bparts = self._base_parts(base)
+        if bparts is None:
+            return to_rel(base, target)
+        rel = self._rel_str.get(target)
+        if rel is not None:
+            tparts = rel.split("/")
+        else:
+            try:
+                tparts = target.relative_to(self.ROOT).parts
+            except ValueError:
+                return to_rel(base, target)
+        i = 0
+        n = min(len(bparts), len(tparts))
+        while i < n and bparts[i] == tparts[i]:
+            i += 1
+        return "../" * (len(bparts) - i) + "/".join(tparts[i:])
 
     def _collect_conflicts(self, stem_or_name: str) -> List[Path]:
         return list(dict.fromkeys(
             self.BASENAME_INDEX.get(stem_or_name, []) +
-            self.BASENAME_INDEX.get(Path(stem_or_name).stem, [])
+            self.BASENAME_INDEX.get(path_stem(stem_or_name), [])
         ))
 
+    def _conflicts_noext(self, stem: str) -> set:
+        """Vault-relative no-ext paths of all notes sharing this stem (memoized)."""
+        s = self._conflict_noext.get(stem)
+        if s is None:
+            s = {self._rel_noext[p] for p in self._collect_conflicts(stem)}
+            self._conflict_noext[stem] = s
+        return s
+
     # ----- core resolution -----
 
     def find_target_path(self, current_file: Path, raw: str) -> str:
         """Resolve note target to vault-rooted path (no .md). Keep #anchor if present."""
+        key = (current_file.parent, raw)
+        out = self._target_memo.get(key)
+        if out is None:
+            out = self._find_target_path(current_file, raw)
+            self._target_memo[key] = out
+        return out
+
+    def _find_target_path(self, current_file: Path, raw: str) -> str:
         anchor = None
         if "#" in raw:
             raw, anchor = raw.split("#", 1)
@@ -68,8 +264,13 @@ class Resolver:
             candidate = Path(str(candidate).lstrip("/"))
 
         base = current_file.parent
-        abs_path = (base / candidate).resolve()
-        if abs_path.exists():
+        # Lexically normalize the target against the vault first: a set lookup
+        # answers the common "link with explicit path" case without any syscall.
+        cur_dir = self.rel_from_root(base)
+        joined = posixpath.normpath(posixpath.join(cur_dir, candidate.as_posix()))
+        if joined in self.REL_SET:
+            out = strip_md_ext(joined)
+        elif (abs_path := Path(_resolved(base / candidate))).exists():
             out = strip_md_ext(self.rel_from_root(abs_path))
         else:
             bn = candidate.name
@@ -78,8 +279,11 @@ class Resolver:
             if not uniq:
                 out = strip_md_ext(candidate.as_posix())
             else:
-                # Prefer file in the same directory as current note
-                same_dir = [m for m in uniq if m.parent.resolve() == base.resolve()]
+                # Prefer file in the same directory as current note. Indexed
+                # paths are canonical (built under the resolved root, symlinks
+                # excluded by the scan), so plain Path equality suffices — no
+                # resolve() round-trip per candidate.
+                same_dir = [m for m in uniq if m.parent == base]
                 if len(same_dir) == 1:
                     out = strip_md_ext(self.rel_from_root(same_dir[0]))
                 elif len(uniq) == 1:
@@ -87,8 +291,8 @@ class Resolver:
                 else:
                     # Rank by proximity (like attachments): same dir, then shortest relpath, then lexicographic
                     def rank(p: Path):
-                        same = 0 if p.parent.resolve() == base.resolve() else 1
-                        rel  = to_rel(base, p)
+                        same = 0 if p.parent == base else 1
+                        rel  = self._to_rel(base, p)
                         return (same, len(rel), rel)
                     best = sorted(uniq, key=rank)[0]
                     out = strip_md_ext(self.rel_from_root(best))
@@ -97,25 +301,50 @@ class Resolver:
             out += f"#{anchor}"
         return out
 
+    def _build_suffix_trie(self) -> dict:
+        """Reverse-segment trie over every no-ext note path.
+
+        Each node maps a path segment to its child; the None key counts the
+        paths in the subtree, so a suffix is unique in the vault exactly when
+        its node's count is 1.
+        """
+        trie: dict = {}
+        for rel in self._noext_set:
+            node = trie
+            for seg in reversed(rel.split("/")):
+                nxt = node.get(seg)
+                if nxt is None:
+                    nxt = node[seg] = {None: 0}
+                nxt[None] += 1
+                node = nxt
+        return trie
+
     def _shortest_suffix_from_vault(self, target_abs_no_ext: str) -> str:
         """Root-relative shortest, at least 'dir/stem' if not in root."""
-        target_path = Path(target_abs_no_ext)
-        parts = target_path.parts
-        stem = target_path.name
-
-        conflicts = self._collect_conflicts(stem)
-        conflict_noext = {strip_md_ext(self.rel_from_root(p)) for p in conflicts}
-
-        def unique(sfx: str) -> bool:
-            matches = [c for c in conflict_noext if c.endswith('/' + sfx) or c == sfx]
-            return len(matches) == 1 and matches[0] == target_abs_no_ext
-
-        candidates = [stem] + [Path(*parts[-take:]).as_posix() for take in range(2, len(parts) + 1)]
-        for c in candidates:
-            if unique(c):
-                return c.replace("\\", "/")
-        # Fallback: full path from root (still without .md)
-        return target_abs_no_ext.replace("\\", "/")
+        out = self._shortest_cache.get(target_abs_no_ext)
+        if out is not None:
+            return out
+
+        if target_abs_no_ext in self._noext_set:
+            # walk the trie from the stem outward; the first subtree holding a
+            # single path is the shortest unique suffix (and, since the target
+            # itself lies in that subtree, it names the target)
+            if self._suffix_trie is None:
+                self._suffix_trie = self._build_suffix_trie()
+            parts = target_abs_no_ext.split("/")
+            node = self._suffix_trie
+            out = target_abs_no_ext
+            for take, seg in enumerate(reversed(parts), 1):
+                node = node[seg]
+                if node[None] == 1:
+                    out = "/".join(parts[-take:])
+                    break
+        else:
+            # Target is not a vault note: no suffix can single it out, keep
+            # the full path from root (still without .md)
+            out = target_abs_no_ext
+        self._shortest_cache[target_abs_no_ext] = out
+        return out
     
     def _local_suffix_from_current(self, current_file: Path, target_abs_no_ext: str) -> str | None:
         """
@@ -126,11 +355,9 @@ class Resolver:
         Returns None if LCA is the vault root (to avoid 'CTF/...') or if equal dirs.
         """
         cur_dir = self.rel_from_root(current_file.parent)
-        tgt_path = Path(target_abs_no_ext)
-        tgt_dir  = tgt_path.parent.as_posix()
-
-        cur_parts = Path(cur_dir).parts
-        tgt_parts = tgt_path.parent.parts
+        cur_parts = () if cur_dir == "." else tuple(cur_dir.split("/"))
+        tgt_dir, _, tgt_name = target_abs_no_ext.rpartition("/")
+        tgt_parts = tuple(tgt_dir.split("/")) if tgt_dir else ()
 
         # common prefix length
         i = 0
@@ -144,20 +371,38 @@ class Resolver:
         if i == 0:
             return None
 
-        suffix_parts = tgt_parts[i:] + (tgt_path.name,)
-        return Path(*suffix_parts).as_posix()
+        return "/".join(tgt_parts[i:] + (tgt_name,))
+
+    def _shortest_vault_from_current(self, current_file: Path, target_abs_no_ext: str) -> str:
+        """Vault mode: prefer the local forward-only suffix when it is unique
+        among same-stem notes, otherwise the vault-wide shortest suffix."""
+        local = self._local_suffix_from_current(current_file, target_abs_no_ext)
+        if local:
+            conflict_noext = self._conflicts_noext(path_name(target_abs_no_ext))
+            matches = [c for c in conflict_noext if c.endswith('/' + local) or c == local]
+            if len(matches) == 1 and matches[0] == target_abs_no_ext:
+                return local
+        return self._shortest_suffix_from_vault(target_abs_no_ext)
 
     def _shortest_relative_from_current(self, current_file: Path, target_abs_no_ext: str) -> str:
         base = current_file.parent
         target = self.ROOT / (target_abs_no_ext + ".md")
         try:
-            rel = Path(to_rel(base, target)).with_suffix("")
+            rel = self._to_rel(base, target)
         except Exception:
-            rel = Path(target_abs_no_ext)
-        return rel.as_posix()
+            return target_abs_no_ext
+        return rel[:-3] if rel.endswith(".md") else rel
 
     def resolve_target_for_text_and_meta(self, current_file: Path, raw: str) -> Tuple[str, str | None]:
         """Return (text_target_no_ext[#anchor], meta_relpath_with_md)."""
+        key = (current_file.parent, raw)
+        out = self._resolve_memo.get(key)
+        if out is None:
+            out = self._resolve_target_for_text_and_meta(current_file, raw)
+            self._resolve_memo[key] = out
+        return out
+
+    def _resolve_target_for_text_and_meta(self, current_file: Path, raw: str) -> Tuple[str, str | None]:
         if "|" in raw:
             target, _ = raw.split("|", 1)
         else:
@@ -176,11 +421,12 @@ class Resolver:
 
         # If there is a file with this stem in the SAME directory as current note,
         # force it as the target and keep plain stem in the wikilink.
-        stem = Path(abs_no_ext_clean).name
+        stem = path_name(abs_no_ext_clean)
         conflicts = list(dict.fromkeys(
-            self.BASENAME_INDEX.get(stem, []) + self.BASENAME_INDEX.get(Path(stem).stem, [])
+            self.BASENAME_INDEX.get(stem, []) + self.BASENAME_INDEX.get(path_stem(stem), [])
         ))
-        same_dir = [p for p in conflicts if p.parent.resolve() == current_file.parent.resolve()]
+        cur_dir = current_file.parent
+        same_dir = [p for p in conflicts if p.parent == cur_dir]
         if same_dir:
             # Pin target to same-dir file
             pinned = strip_md_ext(self.rel_from_root(same_dir[0]))
@@ -190,22 +436,7 @@ class Resolver:
             meta_with_md = abs_no_ext_clean + ".md"
             return (text_target, meta_with_md)
 
-        if self.mode == "relative":
-             shortest = self._shortest_relative_from_current(current_file, abs_no_ext_clean)
-        else:
-             local = self._local_suffix_from_current(current_file, abs_no_ext_clean)
-             if local:
-                 # ensure it's unique among conflicts for this stem
-                stem = Path(abs_no_ext_clean).name
-                conflicts = self._collect_conflicts(stem)
-                conflict_noext = {strip_md_ext(self.rel_from_root(p)) for p in conflicts}
-                matches = [c for c in conflict_noext if c.endswith('/' + local) or c == local]
-                if len(matches) == 1 and matches[0] == abs_no_ext_clean:
-                    shortest = local
-                else:
-                    shortest = self._shortest_suffix_from_vault(abs_no_ext_clean)
-             else:
-                 shortest = self._shortest_suffix_from_vault(abs_no_ext_clean)
+        shortest = self._shortest_for(current_file, abs_no_ext_clean)
 
         text_target = f"{shortest}#{anchor}" if anchor else shortest
         meta_with_md = abs_no_ext_clean + ".md"
@@ -235,90 +466,104 @@ class Resolver:
             return raw
 
         base = current_file.parent
-        name = Path(target).name  # basename only
-
-        # Collect candidates in the whole vault
-        candidates: list[Path] = []
-        if "." in name:  # has extension -> exact basename search
-            for f in self.ROOT.rglob(name):
-                if f.is_file():
-                    candidates.append(f)
+        name = path_name(target)  # basename only
+
+        # Look up candidates in the prebuilt asset index
+        if "." in name:  # has extension -> exact basename lookup
+            candidates = self.ASSET_BY_NAME.get(name, [])
         else:
-            # no extension -> try known asset extensions
-            for ext in ASSET_EXTS:
-                for f in self.ROOT.rglob(name + ext):
-                    if f.is_file():
-                        candidates.append(f)
+            # no extension -> any known asset extension for that stem
+            candidates = self.ASSET_BY_STEM.get(name, [])
 
         if not candidates:
             # nothing found; keep as typed (basename)
             return name
 
-        # Ranking:
-        #  1) same directory as the note (best)
-        #  2) shortest relative path length (closest)
-        #  3) lexicographic tie-break by the relative path
-        def rank(p: Path):
-            same_dir = 0 if p.parent.resolve() == base.resolve() else 1
-            rel = to_rel(base, p)
-            return (same_dir, len(rel), rel)
-
-        candidates.sort(key=rank)
-        best = candidates[0]
-        rel = to_rel(base, best)
+        if len(candidates) == 1:
+            # unique basename (the overwhelmingly common case): no ranking,
+            # just the relative path from the note's directory
+            parts = candidates[0][0]
+            bparts = self._base_parts(base) or ()
+            i = 0
+            n = min(len(bparts), len(parts))
+            while i < n and bparts[i] == parts[i]:
+                i += 1
+            rel = "../" * (len(bparts) - i) + "/".join(parts[i:])
+        else:
+            rel = self._rank_assets(base, candidates)
 
         # Prefix "./" if it's a subdir (not already ./ or ../ and not absolute)
         if not rel.startswith(("./", "../")) and "/" in rel and not rel.startswith("/"):
             rel = "./" + rel
         return rel
 
+    def _rank_assets(self, base: Path, candidates) -> str:
+        # Ranking on the precomputed vault-relative parts (pure string work):
+        #  1) same directory as the note (best)
+        #  2) shortest relative path length (closest)
+        #  3) lexicographic tie-break by the relative path
+        bparts = self._base_parts(base) or ()
+        nb = len(bparts)
+        def rank(info):
+            parts, _p = info
+            i = 0
+            n = min(nb, len(parts))
+            while i < n and bparts[i] == parts[i]:
+                i += 1
+            rel = "../" * (nb - i) + "/".join(parts[i:])
+            return (0 if parts[:-1] == bparts else 1, len(rel), rel)
+
+        return min(map(rank, candidates))[2]
+
 
     # ----- normalization passes -----
 
-    def normalize_md_links_to_wikilinks(self, current_file: Path, text: str) -> str:
-        """Convert standard Markdown links to wikilinks where appropriate."""
+    def _render_wikilink(self, current_file: Path, bang: str, body: str, unchanged: str) -> str:
+        """Emit the final normalized form of one wikilink body."""
+        alias = None
+        if "|" in body:
+            target_part, alias = body.split("|", 1)
+        else:
+            target_part = body
+
+        if bang == "!":
+            asset_rel = self.resolve_asset_for_text(current_file, target_part)
+            return f"![[{asset_rel}|{alias}]]" if alias is not None else f"![[{asset_rel}]]"
+
+        text_target, _meta = self.resolve_target_for_text_and_meta(current_file, body)
+        if not text_target or text_target.strip() == body.strip():
+            return unchanged
+        return f"[[{text_target}|{alias}]]" if alias is not None else f"[[{text_target}]]"
+
+    def normalize_all(self, current_file: Path, text: str) -> str:
+        """Normalize markdown links and wikilinks in one combined-regex pass.
+
+        Markdown links are converted to wikilinks and normalized in the same
+        substitution, so the body is scanned and rebuilt once instead of once
+        per link form.
+        """
         masked = CodeMasker.mask(text)
+
         def repl(m):
-            bang = m.group(1)
-            url  = m.group("url").strip()
+            body = m.group(WIKI_BODY_I)
+            if body is not None:
+                return self._render_wikilink(current_file, m.group(WIKI_BANG_I), body, m.group(0))
 
+            url = m.group(MD_URL_I).strip()
             if url.startswith("#"):
                 return m.group(0)
-
-            if re.match(r'^(?:[a-zA-Z][a-zA-Z0-9+.-]*:|//)', url):
+            if _URL_SCHEME_RE.match(url):
                 return m.group(0)
 
-            target = self.find_target_path(current_file, url)
-
-            suffix = Path(url).suffix.lower()
-            if bang == "!" or suffix in IMG_EXTS or suffix in ASSET_EXTS:
+            suffix = suffix_lower(url)
+            if m.group(MD_BANG_I) == "!" or suffix in IMG_EXTS or suffix in ASSET_EXTS:
                 asset_rel = self.resolve_asset_for_text(current_file, url)
                 return f"![[{asset_rel}]]"
 
-            return f"[[{target}]]"
+            # note link: convert to a wikilink and normalize it in the same step
+            target = self.find_target_path(current_file, url)
+            return self._render_wikilink(current_file, "", target, f"[[{target}]]")
 
-        out = MD_LINK.sub(repl, masked.text)
+        out = COMBINED_LINK.sub(repl, masked.text)
         return CodeMasker.unmask(Masked(out, masked.slots))
 
-    def normalize_wikilinks_in_text(self, current_file: Path, text: str) -> str:
-        """Normalize wikilinks [[...]] and ![[...]] preserving alias and #anchor."""
-        masked = CodeMasker.mask(text)
-        def repl(m):
-            bang  = m.group("bang")
-            body  = m.group("body")
-            alias = None
-            if "|" in body:
-                target_part, alias = body.split("|", 1)
-            else:
-                target_part = body
-
-            if bang == "!":
-                asset_rel = self.resolve_asset_for_text(current_file, target_part)
-                return f"![[{asset_rel}|{alias}]]" if alias is not None else f"![[{asset_rel}]]"
-
-            text_target, _meta = self.resolve_target_for_text_and_meta(current_file, body)
-            if not text_target or text_target.strip() == body.strip():
-                return m.group(0)
-            return f"[[{text_target}|{alias}]]" if alias is not None else f"[[{text_target}]]"
-        out = WIKI_LINK.sub(repl, masked.text)
-        return CodeMasker.unmask(Masked(out, masked.slots))
@@ -7,37 +7,70 @@ Parsing utilities:
 import re
 from typing import Tuple, List, Dict
 
-# Basic patterns (duplicated here to avoid circular imports)
-MD_LINK   = re.compile(r'(!?)\[(?P<text>[^\]]*)\]\((?P<url>[^)]+)\)')
-WIKI_LINK = re.compile(r'(?P<bang>!?)\[\[(?P<body>.+?)\]\]')
+from .patterns import MD_LINK, WIKI_LINK, compile_linear
 
-ATX       = re.compile(r'^(?P<hashes>#{1,6})\s*(?P<text>.+?)\s*#*\s*$')
-SETEXT_H1 = re.compile(r'^\s*={3,}\s*$')
-SETEXT_H2 = re.compile(r'^\s*-{3,}\s*$')
+ATX       = compile_linear(r'^(?P<hashes>#{1,6})\s*(?P<text>.+?)\s*#*\s*$')
+SETEXT_H1 = compile_linear(r'^\s*={3,}\s*$')
+SETEXT_H2 = compile_linear(r'^\s*-{3,}\s*$')
 
-FM_START  = re.compile(r'^\s*---\s*$')
-FM_END    = re.compile(r'^\s*(---|\.\.\.)\s*$')
+# All three heading forms in one alternation, so extract_headings runs at most
+# one regex per line. The branches are mutually exclusive (ATX requires a
+# leading '#', setext lines hold only '='/'-').
+HEADING_RE = compile_linear(
+    r'^(?P<hashes>#{1,6})\s*(?P<text>.+?)\s*#*\s*$'
+    r'|^\s*(?P<h1>={3,})\s*$'
+    r'|^\s*(?P<h2>-{3,})\s*$'
+)
+
+# Both link forms in one alternation for tag-stripping. One pass is not
+# always enough: removing a wikilink nested in a markdown link's text exposes
+# the surrounding markdown link, so the caller runs a second pass when
+# brackets survive the first (the old WIKI-then-MD sequence stripped both).
+LINK_STRIP_RE = compile_linear(WIKI_LINK.pattern + "|" + MD_LINK.pattern)
+
+FM_START  = compile_linear(r'^\s*---\s*$')
+FM_END    = compile_linear(r'^\s*(---|\.\.\.)\s*$')
+# look-behind: stays on the stdlib engine
 INLINE_TAG = re.compile(r'(?<!\w)#([A-Za-z0-9/_-]+)')
 
-def extract_headings(lines: List[str]) -> List[Dict]:
+# Frontmatter line patterns, hoisted out of the per-line loop
+FM_TAGS_KEY_RE  = compile_linear(r'^\s*(tags|aliases)\s*:\s*$')
+FM_LIST_ITEM_RE = compile_linear(r'^\s*-\s*(.+?)\s*$')
+FM_KV_RE        = compile_linear(r'^\s*([A-Za-z0-9_.-]+)\s*:\s*(.*)$')
+
+def _iter_lines(text: str):
+    """Yield lines one at a time instead of allocating the splitlines() list."""
+    start = 0
+    find = text.find
+    while True:
+        end = find("\n", start)
+        if end < 0:
+            break
+        line = text[start:end]
+        if line.endswith("\r"):
+            line = line[:-1]
+        yield line
+        start = end + 1
+    if start < len(text):
+        yield text[start:]
+
+def extract_headings(text: str) -> List[Dict]:
     headings = []
     prev = ""
-    for line in lines:
-        m = ATX.match(line)
-        if m:
-            level = len(m.group("hashes"))
-            text  = m.group("text").strip()
-            if text:
-                headings.append({"heading": text, "level": level})
-        else:
-            if SETEXT_H1.match(line):
-                t = prev.strip()
-                if t:
-                    headings.append({"heading": t, "level": 1})
-            elif SETEXT_H2.match(line):
-                t = prev.strip()
-                if t:
-                    headings.append({"heading": t, "level": 2})
+    for line in _iter_lines(text):
+        # no heading form can start with any other character; skip the regex
+        # entirely for ordinary lines (but still record them as prev)
+        if line and line[0] in "#=- \t":
+            m = HEADING_RE.match(line)
+            if m:
+                if m.group("hashes"):
+                    t = m.group("text").strip()
+                    if t:
+                        headings.append({"heading": t, "level": len(m.group("hashes"))})
+                else:
+                    t = prev.strip()
+                    if t:
+                        headings.append({"heading": t, "level": 1 if m.group("h1") else 2})
         prev = line
     return headings
 
@@ -45,29 +78,46 @@ def parse_frontmatter_and_tags(text: str) -> Tuple[Dict, list, list, str]:
     """
     Returns: (frontmatter_dict, tags_list, aliases_list, body_without_frontmatter)
     """
-    lines = text.splitlines()
     fm = {}
     tags, aliases = [], []
-    body_start = 0
+    body = text
 
-    if lines and FM_START.match(lines[0]):
-        i = 1
+    # Walk the frontmatter by character offsets instead of splitlines(): the
+    # body then comes out as an exact slice of the original text, preserving
+    # line endings and the trailing newline (the join-based version dropped
+    # them, which also threw off the header-length arithmetic in
+    # process_file and could duplicate the first body character on rewrite).
+    first_nl = text.find("\n")
+    first_line = text[:first_nl] if first_nl >= 0 else text
+    if first_nl >= 0 and first_line and FM_START.match(first_line):
         block = []
-        while i < len(lines) and not FM_END.match(lines[i]):
-            block.append(lines[i]); i += 1
-        body_start = i + 1 if i < len(lines) else 0
+        body_off = 0
+        pos = first_nl + 1
+        n = len(text)
+        while pos < n:
+            nxt = text.find("\n", pos)
+            line = text[pos:nxt] if nxt >= 0 else text[pos:]
+            if line.endswith("\r"):
+                line = line[:-1]
+            if FM_END.match(line):
+                body_off = nxt + 1 if nxt >= 0 else n
+                break
+            block.append(line)
+            if nxt < 0:
+                break
+            pos = nxt + 1
 
         cur_key = None
         for ln in block:
-            if re.match(r'^\s*(tags|aliases)\s*:\s*$', ln):
+            if FM_TAGS_KEY_RE.match(ln):
                 cur_key = ln.split(':')[0].strip()
                 fm[cur_key] = []
                 continue
-            m = re.match(r'^\s*-\s*(.+?)\s*$', ln)
+            m = FM_LIST_ITEM_RE.match(ln)
             if m and cur_key in ('tags', 'aliases'):
                 fm[cur_key].append(m.group(1))
                 continue
-            kv = re.match(r'^\s*([A-Za-z0-9_.-]+)\s*:\s*(.*)$', ln)
+            kv = FM_KV_RE.match(ln)
             if kv:
                 fm[kv.group(1)] = kv.group(2)
                 cur_key = None
@@ -75,12 +125,20 @@ def parse_frontmatter_and_tags(text: str) -> Tuple[Dict, list, list, str]:
         tags    = list(dict.fromkeys(fm.get('tags', [])))
         aliases = list(dict.fromkeys(fm.get('aliases', [])))
 
-    body = "\n".join(lines[body_start:]) if body_start else text
+        # no closing fence: treat the whole text as body, like before
+        body = text[body_off:] if body_off else text
 
-    # Strip links before scanning inline #tags
-    body_for_tags = WIKI_LINK.sub(' ', body)
-    body_for_tags = MD_LINK.sub(' ', body_for_tags)
-    inline = [m.group(1) for m in INLINE_TAG.finditer(body_for_tags)]
+    # Strip links before scanning inline #tags; both passes only fire when
+    # their trigger character is present at all
+    if "[" in body:
+        body_for_tags = LINK_STRIP_RE.sub(' ', body)
+        if "[" in body_for_tags:
+            # nested forms: stripping a wikilink can expose a markdown link
+            body_for_tags = LINK_STRIP_RE.sub(' ', body_for_tags)
+    else:
+        body_for_tags = body
+    inline = [m.group(1) for m in INLINE_TAG.finditer(body_for_tags)] \
+        if "#" in body_for_tags else []
     if inline:
         merged = tags + [t for t in inline if t not in tags]
         tags = list(dict.fromkeys(merged))
@@ -0,0 +1,26 @@
+"""
+Regex patterns shared by links.py and parse.py, compiled once at import.
+(Previously duplicated in both modules to avoid circular imports.)
+"""
+import re
+
+try:
+    import re2  # optional: RE2 matches in linear time, no backtracking blowups
+except ImportError:
+    re2 = None
+
+def compile_linear(pattern: str):
+    """Compile with google-re2 when it is installed, else the stdlib engine.
+
+    Only meant for patterns RE2 can express — no backreferences, no
+    look-around. Patterns that need those constructs keep re.compile.
+    """
+    if re2 is not None:
+        try:
+            return re2.compile(pattern)
+        except Exception:
+            pass  # construct RE2 cannot handle; use the stdlib engine
+    return re.compile(pattern)
+
+MD_LINK   = compile_linear(r'(!?)\[(?P<text>[^\]]*)\]\((?P<url>[^)]+)\)')
+WIKI_LINK = compile_linear(r'(?P<bang>!?)\[\[(?P<body>.+?)\]\]')
@@ -15,6 +15,7 @@ FENCED_RE = re.compile(
 # Inline code `...` (greedy-protected; supports multiple backticks)
 INLINE_CODE_RE = re.compile(r'(?<!`)`{1,}([^`]|`(?!`))+?`{1,}')
 
+
 @dataclass
 class Masked:
     text: str
@@ -24,32 +25,50 @@ class CodeMasker:
     """Masks fenced and inline code regions to protect them from parsing/mutations."""
 
     TOKEN = "\uE000CODEMASK\uE000"  # private-use area marker
+    _END = "\uE000"  # closes the slot number, so following document digits can't blend in
+    _TOKEN_RE = re.compile(re.escape(TOKEN) + r"(\d+)" + _END)
 
     @classmethod
     def mask(cls, s: str) -> Masked:
         slots: list[str] = []
 
-        # 1) mask fenced blocks first (multiline)
-        def repl_fenced(m):
-            slots.append(m.group(0))
-            return cls.TOKEN + str(len(slots)-1)
-
-        s = FENCED_RE.sub(repl_fenced, s)
+        # nothing to mask without a backtick or tilde fence anywhere
+        if "`" not in s and "~~~" not in s:
+            return Masked(text=s, slots=slots)
 
-        # 2) mask inline code on the remaining text
-        def repl_inline(m):
+        # Fenced blocks claim their regions first; inline code is scanned only
+        # in the gaps between them. A combined alternation is not equivalent:
+        # matching is leftmost-first, so an unpaired inline backtick earlier in
+        # the document would swallow a later fence opener as its closing
+        # backticks and leave the fence body unprotected. The gaps are spliced
+        # by index instead of letting sub() rebuild the string per match.
+        parts: list[str] = []
+        last = 0
+        for m in FENCED_RE.finditer(s):
+            cls._mask_inline(s[last:m.start()], parts, slots)
+            parts.append(cls.TOKEN + str(len(slots)) + cls._END)
             slots.append(m.group(0))
-            return cls.TOKEN + str(len(slots)-1)
-
-        s = INLINE_CODE_RE.sub(repl_inline, s)
+            last = m.end()
+        cls._mask_inline(s[last:], parts, slots)
+        if not slots:
+            return Masked(text=s, slots=slots)
+        return Masked(text="".join(parts), slots=slots)
 
-        return Masked(text=s, slots=slots)
+    @classmethod
+    def _mask_inline(cls, gap: str, parts: list[str], slots: list[str]):
+        last = 0
+        for m in INLINE_CODE_RE.finditer(gap):
+            parts.append(gap[last:m.start()])
+            parts.append(cls.TOKEN + str(len(slots)) + cls._END)
+            slots.append(m.group(0))
+            last = m.end()
+        parts.append(gap[last:])
 
     @classmethod
     def unmask(cls, masked: Masked) -> str:
-        s = masked.text
-
-        # Replace tokens back in reverse to avoid partial overlaps
-        for idx in range(len(masked.slots) - 1, -1, -1):
-            s = s.replace(cls.TOKEN + str(idx), masked.slots[idx])
-        return s
+        if not masked.slots:
+            return masked.text
+        slots = masked.slots
+        # one pass over the text; the old per-slot str.replace loop rescanned
+        # the whole document once per code region
+        return cls._TOKEN_RE.sub(lambda m: slots[int(m.group(1))], masked.text)